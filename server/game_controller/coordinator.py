@@ -0,0 +1,283 @@
+"""Contains the coordinator, which shards simulations across worker processes"""
+
+import asyncio
+import socket
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+from game_controller.prefork import split_range
+from game_controller.shard_worker import (
+    HEARTBEAT_INTERVAL,
+    Message,
+    decode_message,
+    encode_message,
+)
+from game_controller.simulator import SIMULATION_CONFIGS, BatchSummary
+
+# Seconds a new connection has to introduce itself before it is dropped.
+HELLO_TIMEOUT = 10.0
+# Seconds connections get to receive "done" once every task is accounted for.
+CLOSE_GRACE = 1.0
+# Seconds without any message after which a worker running a task is lost.
+HEARTBEAT_TIMEOUT = 3 * HEARTBEAT_INTERVAL
+# Default upper bound, in seconds, for a single task, heartbeats or not.
+TASK_TIMEOUT = 600.0
+
+
+def _is_count(value: object) -> bool:
+    """If `value` is a non-negative int, and not a bool."""
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+
+def _enable_keepalive(sock: Optional[socket.socket]) -> None:
+    """Let the kernel detect dead peers on an idle connection within a minute."""
+    if sock is None:
+        return
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    # the fine-grained options are platform specific
+    for option, value in (
+        ("TCP_KEEPIDLE", 30),
+        ("TCP_KEEPINTVL", 10),
+        ("TCP_KEEPCNT", 3),
+    ):
+        if hasattr(socket, option):
+            sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, option), value)
+
+
+@dataclass(frozen=True)
+class Job:
+    """Simulate the seeds in `range(start, stop)` with the config `config_id`."""
+
+    config_id: str
+    start: int
+    stop: int
+
+
+@dataclass(frozen=True)
+class Task:
+    """A seed range of a job, the unit of work handed to a worker."""
+
+    task_id: int
+    config_id: str
+    start: int
+    stop: int
+
+    def to_message(self) -> Message:
+        """Build the message sent to the worker."""
+        return {
+            "type": "task",
+            "task_id": self.task_id,
+            "config_id": self.config_id,
+            "start": self.start,
+            "stop": self.stop,
+        }
+
+
+# pylint: disable=too-many-instance-attributes
+class Coordinator:
+    """
+    Hands out tasks to shard workers connecting over TCP and merges their
+    results.
+    Every task is accounted for exactly once: a task is only done when its
+    first valid result arrives, later results of the same task are ignored.
+    Workers send heartbeats while running a task. When a worker disconnects,
+    misses its heartbeats for `heartbeat_timeout`, or does not finish within
+    `task_timeout`, its task is put back at the front of the queue for the
+    other workers. Accepted sockets also use TCP keepalive.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        jobs: List[Job],
+        batch_size: int = 1000,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        task_timeout: Optional[float] = TASK_TIMEOUT,
+        heartbeat_timeout: float = HEARTBEAT_TIMEOUT,
+    ) -> None:
+        """
+        Raises:
+        ValueError: if a job refers to an unknown config or batch_size is not
+        positive.
+        """
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+        self._tasks: Dict[int, Task] = {}
+        for job in jobs:
+            if job.config_id not in SIMULATION_CONFIGS:
+                raise ValueError(f"Unknown config {job.config_id!r}")
+            parts = -(-(job.stop - job.start) // batch_size)
+            for seeds in split_range(job.start, job.stop, max(parts, 1)):
+                task_id = len(self._tasks)
+                self._tasks[task_id] = Task(
+                    task_id, job.config_id, seeds.start, seeds.stop
+                )
+        self._host = host
+        self._port = port
+        self._task_timeout = task_timeout
+        self._heartbeat_timeout = heartbeat_timeout
+        self._pending: Deque[int] = deque(self._tasks)
+        self._completed: Set[int] = set()
+        self._results: Dict[str, BatchSummary] = {
+            job.config_id: BatchSummary() for job in jobs
+        }
+        self._changed = asyncio.Condition()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+        self.requeued_count: int = 0
+        self.duplicate_count: int = 0
+
+    @property
+    def task_count(self) -> int:
+        """The number of tasks the jobs were split into."""
+        return len(self._tasks)
+
+    @property
+    def is_done(self) -> bool:
+        """If every task has been accounted for."""
+        return len(self._completed) == len(self._tasks)
+
+    async def start(self) -> Tuple[str, int]:
+        """
+        Start listening for workers.
+        Returns:
+        Tuple[str, int]: the address workers should connect to.
+        """
+        self._server = await asyncio.start_server(
+            self._handle_worker, self._host, self._port
+        )
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return host, port
+
+    async def wait(self) -> Dict[str, BatchSummary]:
+        """Wait until every task is done, stop, and return the summary per config."""
+        async with self._changed:
+            await self._changed.wait_for(lambda: self.is_done)
+        if self._server is not None:
+            self._server.close()
+            # let idle workers receive "done", then drop whatever lingers,
+            # since wait_closed() waits for every open connection
+            if self._connections:
+                await asyncio.wait(list(self._connections), timeout=CLOSE_GRACE)
+            for writer in self._connections.values():
+                writer.close()
+            await self._server.wait_closed()
+        return self._results
+
+    async def run(self) -> Dict[str, BatchSummary]:
+        """Start, then wait until every task is done."""
+        await self.start()
+        return await self.wait()
+
+    async def _next_task(self) -> Optional[Task]:
+        """Wait for a task to hand out, or None once everything is done."""
+        async with self._changed:
+            while True:
+                while self._pending and self._pending[0] in self._completed:
+                    self._pending.popleft()
+                if self._pending:
+                    return self._tasks[self._pending.popleft()]
+                if self.is_done:
+                    return None
+                # tasks may still come back from workers that die
+                await self._changed.wait()
+
+    async def _requeue(self, task: Task) -> None:
+        """Put the task of a lost worker back in front of the queue."""
+        async with self._changed:
+            if task.task_id not in self._completed:
+                self._pending.appendleft(task.task_id)
+                self.requeued_count += 1
+                self._changed.notify_all()
+
+    async def _record(self, message: Message) -> bool:
+        """
+        Merge the result of a task if it is the first valid one.
+        Returns:
+        bool: False if the result is malformed or does not match its task.
+        """
+        task = self._tasks.get(message.get("task_id", -1))
+        games = message.get("games")
+        villager_wins = message.get("villager_wins")
+        total_days = message.get("total_days")
+        if task is None or games != task.stop - task.start:
+            return False
+        if not all(map(_is_count, (games, villager_wins, total_days))):
+            return False
+        if villager_wins > games:
+            return False
+        summary = BatchSummary(games, villager_wins, total_days)
+        async with self._changed:
+            if task.task_id in self._completed:
+                self.duplicate_count += 1
+                return True
+            self._completed.add(task.task_id)
+            self._results[task.config_id].merge(summary)
+            self._changed.notify_all()
+        return True
+
+    async def _wait_result(
+        self, reader: asyncio.StreamReader, task: Task
+    ) -> Optional[Message]:
+        """
+        Read messages until something other than a heartbeat of `task` arrives.
+        Raises:
+        asyncio.TimeoutError: if heartbeats stop or the task takes too long.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = None
+        if self._task_timeout is not None:
+            deadline = loop.time() + self._task_timeout
+        while True:
+            timeout = self._heartbeat_timeout
+            if deadline is not None:
+                timeout = max(min(timeout, deadline - loop.time()), 0.0)
+            message = decode_message(await asyncio.wait_for(reader.readline(), timeout))
+            if (
+                not isinstance(message, dict)
+                or message.get("type") != "heartbeat"
+                or message.get("task_id") != task.task_id
+            ):
+                return message
+
+    async def _handle_worker(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve one worker connection, one task at a time."""
+        task: Optional[Task] = None
+        current = asyncio.current_task()
+        assert current is not None
+        self._connections[current] = writer
+        _enable_keepalive(writer.get_extra_info("socket"))
+        try:
+            hello = decode_message(
+                await asyncio.wait_for(reader.readline(), HELLO_TIMEOUT)
+            )
+            if not isinstance(hello, dict) or hello.get("type") != "hello":
+                return
+            while True:
+                task = await self._next_task()
+                if task is None:
+                    writer.write(encode_message({"type": "done"}))
+                    await writer.drain()
+                    return
+                writer.write(encode_message(task.to_message()))
+                await writer.drain()
+                message = await self._wait_result(reader, task)
+                if (
+                    not isinstance(message, dict)
+                    or message.get("task_id") != task.task_id
+                    or not await self._record(message)
+                ):
+                    return
+                task = None
+        except (OSError, TypeError, ValueError, asyncio.TimeoutError):
+            pass
+        finally:
+            if task is not None:
+                await self._requeue(task)
+            del self._connections[current]
+            writer.close()
@@ -0,0 +1,47 @@
+"""Contains the preforked worker pool used to run simulation shards"""
+
+import gc
+from typing import Callable, List, Sequence, TypeVar
+
+ShardT = TypeVar("ShardT")
+ResultT = TypeVar("ResultT")
+
+
+def split_range(start: int, stop: int, parts: int) -> List[range]:
+    """Split `range(start, stop)` into at most `parts` contiguous, non-empty shards."""
+    if parts <= 0:
+        raise ValueError("parts must be positive")
+    total = stop - start
+    size, extra = divmod(total, parts)
+    shards = []
+    for i in range(parts):
+        end = start + size + (i < extra)
+        if end > start:
+            shards.append(range(start, end))
+        start = end
+    return shards
+
+
+def run_preforked(
+    func: Callable[[ShardT], ResultT], shards: Sequence[ShardT], workers: int
+) -> List[ResultT]:
+    """
+    Run `func` on every shard in `workers` forked processes.
+    Everything imported or built before the call is shared copy-on-write with
+    the workers, so they start warm. The objects are frozen out of the garbage
+    collector first, otherwise its bookkeeping writes would copy the pages.
+    Falls back to running in-process when `fork` is not available.
+    """
+    if workers <= 1:
+        return [func(shard) for shard in shards]
+    # only pay for importing multiprocessing when actually forking
+    import multiprocessing  # pylint: disable=import-outside-toplevel
+
+    if "fork" not in multiprocessing.get_all_start_methods():
+        return [func(shard) for shard in shards]
+    gc.freeze()
+    try:
+        with multiprocessing.get_context("fork").Pool(workers) as pool:
+            return pool.map(func, shards, chunksize=1)
+    finally:
+        gc.unfreeze()
@@ -0,0 +1,115 @@
+"""
+Contains the shard worker, which runs simulation tasks handed out by a
+`Coordinator` over a socket.
+
+Messages are JSON objects, one per line:
+    worker -> coordinator  {"type": "hello", "worker": name}
+    coordinator -> worker  {"type": "task", "task_id", "config_id", "start", "stop"}
+    worker -> coordinator  {"type": "heartbeat", "task_id"}, every
+                           HEARTBEAT_INTERVAL seconds while running a task
+    worker -> coordinator  {"type": "result", "task_id", "games", "villager_wins",
+                            "total_days"}
+    coordinator -> worker  {"type": "done"}
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from game_controller.simulator import SIMULATION_CONFIGS, simulate_batch
+
+Message = Dict[str, Any]
+
+# Seconds between two heartbeats of a worker running a task.
+HEARTBEAT_INTERVAL = 5.0
+
+
+def encode_message(message: Message) -> bytes:
+    """Encode a message as a JSON line."""
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+
+def decode_message(line: bytes) -> Optional[Message]:
+    """Decode a JSON line, returns None at the end of the stream."""
+    if not line:
+        return None
+    return json.loads(line)
+
+
+def run_task(task: Message) -> Message:
+    """Simulate the seeds of a task and build its result message."""
+    summary = simulate_batch(
+        range(task["start"], task["stop"]), SIMULATION_CONFIGS[task["config_id"]]
+    )
+    return {
+        "type": "result",
+        "task_id": task["task_id"],
+        "games": summary.games,
+        "villager_wins": summary.villager_wins,
+        "total_days": summary.total_days,
+    }
+
+
+def _send_heartbeats(sock: socket.socket, task_id: int, stop: threading.Event) -> None:
+    """Tell the coordinator the worker is alive until `stop` is set."""
+    heartbeat = encode_message({"type": "heartbeat", "task_id": task_id})
+    while not stop.wait(HEARTBEAT_INTERVAL):
+        try:
+            sock.sendall(heartbeat)
+        except OSError:
+            return
+
+
+def _connect(host: str, port: int, connect_timeout: float) -> socket.socket:
+    """Connect to the coordinator, retrying until `connect_timeout` has passed."""
+    deadline = time.monotonic() + connect_timeout
+    while True:
+        try:
+            return socket.create_connection((host, port))
+        except OSError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.1)
+
+
+def run_worker(
+    host: str,
+    port: int,
+    name: Optional[str] = None,
+    connect_timeout: float = 10.0,
+) -> int:
+    """
+    Run tasks from the coordinator at `host:port` until it says it is done.
+    Returns:
+    int: the number of tasks completed.
+    Raises:
+    ConnectionError: if the coordinator goes away before it is done.
+    """
+    completed = 0
+    with _connect(host, port, connect_timeout) as sock, sock.makefile("rb") as reader:
+        name = name or f"{socket.gethostname()}:{os.getpid()}"
+        sock.sendall(encode_message({"type": "hello", "worker": name}))
+        while True:
+            message = decode_message(reader.readline())
+            if message is None:
+                raise ConnectionError("the coordinator closed the connection")
+            if message["type"] == "done":
+                return completed
+            stop = threading.Event()
+            heartbeats = threading.Thread(
+                target=_send_heartbeats,
+                args=(sock, message["task_id"], stop),
+                daemon=True,
+            )
+            heartbeats.start()
+            try:
+                result = run_task(message)
+            finally:
+                # joined before the result is sent, so lines never interleave
+                stop.set()
+                heartbeats.join()
+            sock.sendall(encode_message(result))
+            completed += 1
@@ -0,0 +1,96 @@
+"""Contains the self-play simulator, which plays whole games under a public policy"""
+
+import random
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from game_logic.game import Game, GameState
+from game_logic.player import Player, Role
+from game_logic.result import GameResult
+from solver.game_solver import SIX_PLAYER_ROLES, Policy
+
+# Simulation configs of the 6 player game, referred to by ID across processes.
+SIMULATION_CONFIGS: Dict[str, Policy] = {
+    "six-player": Policy(),
+    "six-player-no-potions": Policy(witch_save=0.0, witch_poison=0.0),
+    "six-player-poison-first": Policy(witch_save=0.0, witch_poison=1.0),
+}
+
+
+@dataclass
+class BatchSummary:
+    """The compact result of a batch of simulated games."""
+
+    games: int = 0
+    villager_wins: int = 0
+    total_days: int = 0
+
+    @property
+    def villager_win_rate(self) -> float:
+        """The share of games won by the villagers."""
+        return self.villager_wins / self.games if self.games else 0.0
+
+    def add(self, result: GameResult, days: int) -> None:
+        """Account for one finished game."""
+        self.games += 1
+        self.villager_wins += result == GameResult.VILLAGERS_WIN
+        self.total_days += days
+
+    def merge(self, other: "BatchSummary") -> None:
+        """Add the games of another summary into this one."""
+        self.games += other.games
+        self.villager_wins += other.villager_wins
+        self.total_days += other.total_days
+
+
+def _alive(game: Game, exclude: Optional[Role] = None) -> List[Player]:
+    """The alive players of a game, optionally without those of a role."""
+    # pylint: disable=protected-access
+    return [p for p in game._players if p.is_alive and p.role != exclude]
+
+
+def simulate_game(
+    seed: int,
+    policy: Policy = Policy(),
+    roles: Optional[Dict[Role, int]] = None,
+) -> Tuple[GameResult, int]:
+    """
+    Play a game from start to end with every player following `policy`.
+    The same seed always gives the same result.
+    Returns:
+    Tuple[GameResult, int]: the result and the number of days played.
+    """
+    rng = random.Random(seed)
+    game = Game()
+    # pylint: disable=protected-access
+    for role, count in (roles or SIX_PLAYER_ROLES).items():
+        for _ in range(count):
+            game._players.append(Player(len(game._players) + 1, role))
+    game.start()
+    while game._state != GameState.FINISHED:
+        if game._state == GameState.MORNING:
+            game.process_morning_voting_result([rng.choice(_alive(game)).id])
+        else:
+            victim = rng.choice(_alive(game, Role.WEREWOLF)).id
+            game.process_werewolf_voting_result([victim])
+            witch = game._get_player_by_role(Role.WITCH)
+            if witch and witch.witch_antidote and rng.random() < policy.witch_save:
+                game.process_witch_saving(victim)
+            elif witch and witch.witch_poison and rng.random() < policy.witch_poison:
+                game.process_witch_killing(rng.choice(_alive(game, Role.WITCH)).id)
+        game.state_switch()
+    result = game.get_result()
+    assert result is not None
+    return result, game._day
+
+
+def simulate_batch(
+    seeds: Iterable[int],
+    policy: Policy = Policy(),
+    roles: Optional[Dict[Role, int]] = None,
+) -> BatchSummary:
+    """Play one game per seed and summarize the results."""
+    summary = BatchSummary()
+    for seed in seeds:
+        summary.add(*simulate_game(seed, policy, roles))
+    return summary
@@ -1,4 +1,287 @@
-"""Entry Point for Server"""
+"""
+Entry Point for Server
+
+Subcommands:
+    serve       run the agent server
+    simulate    run self-play games of the 6 player config
+    tournament  compare policies on the same seeds
+    replay      replay a JSON lines event log as a spectator would see it
+    coordinate  hand out simulation shards to workers and merge their results
+    work        run simulation shards for a coordinator
+
+Heavy subsystems are imported inside the subcommand that needs them, so that
+short-lived workers only pay for what they run. Keep module-level imports of
+this file to the standard library modules argparse already needs.
+"""
+
+# pylint: disable=import-outside-toplevel
+# ^ lazy imports are the point of this module, see the docstring above
+
+from __future__ import annotations
+
+import argparse
+import sys
+
+# `typing` alone costs more than the rest of this file to import, so the
+# builtin generics are used instead and type-only imports are guarded here.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from game_controller.simulator import BatchSummary
+    from spectator.spectator_gateway import Viewer
+
+
+def _parse_policy(text: str) -> tuple[float, float]:
+    """Parse a `witch_save,witch_poison` pair."""
+    try:
+        save, poison = (float(part) for part in text.split(","))
+    except ValueError as ex:
+        raise argparse.ArgumentTypeError(
+            f"expected WITCH_SAVE,WITCH_POISON, got {text!r}"
+        ) from ex
+    return save, poison
+
+
+def _serve(args: argparse.Namespace) -> int:
+    """Run the agent server."""
+    import asyncio
+
+    from agent_server.agent_server import AgentServer
+
+    del args
+    try:
+        asyncio.run(AgentServer().start())
+    except NotImplementedError:
+        print("serve: the agent server is not implemented yet", file=sys.stderr)
+        return 1
+    return 0
+
+
+def _run_shards(policy: tuple[float, float], args: argparse.Namespace) -> BatchSummary:
+    """Simulate `args.games` games from `args.seed`, preforked if asked to."""
+    from functools import partial
+
+    from game_controller.prefork import run_preforked, split_range
+    from game_controller.simulator import BatchSummary, simulate_batch
+    from solver.game_solver import Policy
+
+    shards = split_range(args.seed, args.seed + args.games, max(args.prefork, 1))
+    summary = BatchSummary()
+    for part in run_preforked(
+        partial(simulate_batch, policy=Policy(*policy)), shards, args.prefork
+    ):
+        summary.merge(part)
+    return summary
+
+
+def _simulate(args: argparse.Namespace) -> int:
+    """Run self-play games and print the summary."""
+    summary = _run_shards(args.policy, args)
+    print(
+        f"games={summary.games} villager_wins={summary.villager_wins} "
+        f"villager_win_rate={summary.villager_win_rate:.4f} "
+        f"avg_days={summary.total_days / max(summary.games, 1):.2f}"
+    )
+    return 0
+
+
+def _tournament(args: argparse.Namespace) -> int:
+    """Run every policy on the same seeds and print them ranked by win rate."""
+    policies = args.policy or [(1.0, 0.5)]
+    results = [(policy, _run_shards(policy, args)) for policy in policies]
+    results.sort(key=lambda item: item[1].villager_win_rate, reverse=True)
+    for rank, ((save, poison), summary) in enumerate(results, 1):
+        print(
+            f"{rank}. witch_save={save} witch_poison={poison} "
+            f"villager_win_rate={summary.villager_win_rate:.4f}"
+        )
+    return 0
+
+
+def _print_frames(viewer: Viewer) -> None:
+    """Print the pending frames of a viewer as JSON lines, with their snapshot."""
+    import json
+
+    while (frame := viewer.poll()) is not None:
+        output = {"seq": frame.seq, "events": list(frame.events)}
+        if frame.snapshot is not None:
+            output["snapshot"] = frame.snapshot
+        print(json.dumps(output))
+
+
+def _replay(args: argparse.Namespace) -> int:
+    """Feed a recorded event log through the spectator gateway."""
+    import json
+
+    from spectator.spectator_gateway import SpectatorGateway
+
+    with open(args.path, encoding="utf-8") as file:
+        events = [json.loads(line) for line in file if line.strip()]
+    # events carry their timestamp in milliseconds, like the client's LogEntry
+    clock = [0.0]
+    # the ring holds the whole log, so coalescing never evicts an unsent event
+    gateway = SpectatorGateway(
+        max_hz=args.max_hz, ring_size=max(len(events), 1), clock=lambda: clock[0]
+    )
+    viewer = gateway.subscribe(args.game_id)
+    for event in events:
+        clock[0] = event.get("timestamp", clock[0] * 1000) / 1000
+        gateway.publish(args.game_id, event)
+        gateway.flush()
+        _print_frames(viewer)
+    # flush what was coalesced after the last frame
+    clock[0] += gateway.interval
+    gateway.flush()
+    _print_frames(viewer)
+    return 0
+
+
+def _coordinate(args: argparse.Namespace) -> int:
+    """Run a coordinator, optionally with local worker processes."""
+    import asyncio
+    import subprocess
+    from contextlib import ExitStack
+
+    from game_controller.coordinator import Coordinator, Job
+
+    async def run() -> dict[str, BatchSummary]:
+        coordinator = Coordinator(
+            [
+                Job(config_id, args.seed, args.seed + args.games)
+                for config_id in args.config or ["six-player"]
+            ],
+            batch_size=args.batch_size,
+            host=args.host,
+            port=args.port,
+            task_timeout=args.task_timeout,
+        )
+        host, port = await coordinator.start()
+        print(f"coordinator listening on {host}:{port}", file=sys.stderr)
+        command = [sys.executable, __file__, "work", "--host", host]
+        with ExitStack() as stack:
+            workers = [
+                stack.enter_context(subprocess.Popen([*command, "--port", str(port)]))
+                for _ in range(args.spawn)
+            ]
+            try:
+                results = await coordinator.wait()
+            except BaseException:
+                # leaving the stack waits for the workers, so stop them first
+                for worker in workers:
+                    worker.terminate()
+                raise
+            for worker in workers:
+                await asyncio.to_thread(worker.wait)
+        return results
+
+    try:
+        results = asyncio.run(run())
+    except ValueError as ex:
+        print(f"coordinate: {ex}", file=sys.stderr)
+        return 1
+    for config_id, summary in results.items():
+        print(
+            f"{config_id}: games={summary.games} "
+            f"villager_win_rate={summary.villager_win_rate:.4f}"
+        )
+    return 0
+
+
+def _work(args: argparse.Namespace) -> int:
+    """Run simulation shards until the coordinator is done."""
+    from game_controller.shard_worker import run_worker
+
+    try:
+        run_worker(args.host, args.port, connect_timeout=args.connect_timeout)
+    except (ConnectionError, OSError) as ex:
+        print(f"work: {ex}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser."""
+    parser = argparse.ArgumentParser(description="The werewolf agent game server.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="run the agent server")
+    serve.set_defaults(handler=_serve)
+
+    for name, handler, help_text in (
+        ("simulate", _simulate, "run self-play games of the 6 player config"),
+        ("tournament", _tournament, "compare policies on the same seeds"),
+    ):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("--games", type=int, default=1000)
+        command.add_argument("--seed", type=int, default=0)
+        command.add_argument(
+            "--prefork",
+            type=int,
+            default=0,
+            metavar="WORKERS",
+            help="run the games in WORKERS preforked processes",
+        )
+        command.set_defaults(handler=handler)
+    commands.choices["simulate"].add_argument(
+        "--policy",
+        type=_parse_policy,
+        default=(1.0, 0.5),
+        metavar="WITCH_SAVE,WITCH_POISON",
+    )
+    commands.choices["tournament"].add_argument(
+        "--policy",
+        type=_parse_policy,
+        action="append",
+        metavar="WITCH_SAVE,WITCH_POISON",
+        help="a policy to compare, can be given several times",
+    )
+
+    replay = commands.add_parser("replay", help="replay a JSON lines event log")
+    replay.add_argument("path")
+    replay.add_argument("--game-id", default="replay")
+    replay.add_argument("--max-hz", type=float, default=10.0)
+    replay.set_defaults(handler=_replay)
+
+    coordinate = commands.add_parser(
+        "coordinate", help="hand out simulation shards to workers"
+    )
+    coordinate.add_argument("--games", type=int, default=100_000)
+    coordinate.add_argument("--seed", type=int, default=0)
+    coordinate.add_argument(
+        "--config",
+        action="append",
+        help="a simulation config ID, can be given several times",
+    )
+    coordinate.add_argument("--batch-size", type=int, default=1000)
+    coordinate.add_argument("--host", default="127.0.0.1")
+    coordinate.add_argument("--port", type=int, default=0)
+    coordinate.add_argument(
+        "--task-timeout",
+        type=float,
+        default=600.0,
+        help="seconds after which a task is given to another worker",
+    )
+    coordinate.add_argument(
+        "--spawn",
+        type=int,
+        default=0,
+        metavar="WORKERS",
+        help="also start WORKERS local worker processes",
+    )
+    coordinate.set_defaults(handler=_coordinate)
+
+    work = commands.add_parser("work", help="run simulation shards")
+    work.add_argument("--host", default="127.0.0.1")
+    work.add_argument("--port", type=int, required=True)
+    work.add_argument("--connect-timeout", type=float, default=10.0)
+    work.set_defaults(handler=_work)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Parse the arguments and run the chosen subcommand."""
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
 
 if __name__ == "__main__":
-    print("Hello World!")
+    sys.exit(main())
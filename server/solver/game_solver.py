@@ -0,0 +1,207 @@
+"""Contains the exhaustive game-tree solver for small configs"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Tuple
+
+from game_logic.game import Game, GameState
+from game_logic.player import Player, Role
+from game_logic.result import GameResult
+
+# The roles the solver understands, in the order used by the state encoding.
+SOLVER_ROLES: Tuple[Role, ...] = (
+    Role.VILLAGER,
+    Role.WEREWOLF,
+    Role.PROPHET,
+    Role.WITCH,
+)
+
+# 2 villagers, 2 werewolves, seer, witch
+SIX_PLAYER_ROLES: Dict[Role, int] = {
+    Role.VILLAGER: 2,
+    Role.WEREWOLF: 2,
+    Role.PROPHET: 1,
+    Role.WITCH: 1,
+}
+
+
+@dataclass(frozen=True)
+class Policy:
+    """
+    The fixed public policy every player follows.
+    - Werewolves kill a uniformly random alive non-werewolf.
+    - The witch uses at most one potion per night: she saves the victim with
+      probability `witch_save` while she has the antidote, otherwise she
+      poisons a uniformly random other alive player with probability
+      `witch_poison` while she has the poison.
+    - The day vote eliminates a uniformly random alive player.
+    """
+
+    witch_save: float = 1.0
+    witch_poison: float = 0.5
+
+
+@dataclass(frozen=True)
+class SolverState:
+    """
+    A canonicalized game state.
+    Players with the same role are interchangeable under a public policy, so
+    the alive mask is reduced to alive counts per role. The policy does not
+    depend on the day either, so the day is not part of the state, and the
+    potions of a dead witch are always False.
+    """
+
+    alive: Tuple[int, ...]  # alive count per role of SOLVER_ROLES
+    antidote: bool
+    poison: bool
+    morning: bool  # False: EVENING, before night actions; True: MORNING, before vote
+
+
+def canonicalize(game: Game) -> SolverState:
+    """
+    Get the canonical state of a game in the EVENING or MORNING state.
+    Raises:
+    ValueError: if the game has a role the solver does not handle, or is not
+    in the EVENING or MORNING state.
+    """
+    # pylint: disable=protected-access
+    if game._state not in (GameState.EVENING, GameState.MORNING):
+        raise ValueError("Only EVENING and MORNING games can be canonicalized")
+    alive = [0] * len(SOLVER_ROLES)
+    antidote = poison = False
+    for player in game._players:
+        if player.role not in SOLVER_ROLES:
+            raise ValueError(f"Role {player.role} is not supported by the solver")
+        if not player.is_alive:
+            continue
+        alive[SOLVER_ROLES.index(player.role)] += 1
+        if player.role == Role.WITCH:
+            antidote = player.witch_antidote
+            poison = player.witch_poison
+    return SolverState(tuple(alive), antidote, poison, game._state == GameState.MORNING)
+
+
+def build_game(state: SolverState) -> Game:
+    """Build a game whose canonical state is `state`. Player IDs follow SOLVER_ROLES."""
+    game = Game()
+    # pylint: disable=protected-access
+    for role, count in zip(SOLVER_ROLES, state.alive):
+        for _ in range(count):
+            player = Player(len(game._players) + 1, role)
+            if role == Role.WITCH:
+                player.witch_antidote = state.antidote
+                player.witch_poison = state.poison
+            game._players.append(player)
+    game._state = GameState.MORNING if state.morning else GameState.EVENING
+    return game
+
+
+def _nth_alive(game: Game, role: Role, n: int = 0) -> int:
+    """Get the ID of the `n`-th alive player with the given role."""
+    # pylint: disable=protected-access
+    players = [p for p in game._players if p.is_alive and p.role == role]
+    return players[n].id
+
+
+class GameSolver:
+    """
+    Computes the probability that the villagers win from every canonical state
+    under a fixed public policy. Transitions are played on real `Game` objects,
+    so the solver follows exactly the same rules as the referee.
+    """
+
+    def __init__(self, policy: Policy = Policy()) -> None:
+        self.policy = policy
+        self._memo: Dict[SolverState, float] = {}
+
+    @property
+    def solved_count(self) -> int:
+        """The number of memoized states."""
+        return len(self._memo)
+
+    def solve(self, state: SolverState) -> float:
+        """Get the probability that the villagers win from `state`."""
+        value = self._memo.get(state)
+        if value is None:
+            game = build_game(state)
+            if game.is_end():
+                value = 1.0 if game.get_result() == GameResult.VILLAGERS_WIN else 0.0
+            else:
+                value = sum(
+                    prob * self._value_after(game)
+                    for prob, game in self._successors(state)
+                )
+            self._memo[state] = value
+        return value
+
+    def solve_game(self, game: Game) -> float:
+        """Get the probability that the villagers win from a live game."""
+        # pylint: disable=protected-access
+        if game._state == GameState.FINISHED:
+            return 1.0 if game.get_result() == GameResult.VILLAGERS_WIN else 0.0
+        return self.solve(canonicalize(game))
+
+    def _value_after(self, game: Game) -> float:
+        """Finish the transition of `game` and evaluate the state it lands in."""
+        game.state_switch()
+        return self.solve_game(game)
+
+    def _targets(
+        self, state: SolverState, exclude: Tuple[Role, ...]
+    ) -> List[Tuple[float, Role]]:
+        """Uniform target distribution over alive players, grouped by role."""
+        counts = [
+            (count, role)
+            for role, count in zip(SOLVER_ROLES, state.alive)
+            if count and role not in exclude
+        ]
+        total = sum(count for count, _ in counts)
+        if not total:
+            return []
+        return [(count / total, role) for count, role in counts]
+
+    @staticmethod
+    def _picks(
+        state: SolverState, first: Role, second: Role
+    ) -> List[Tuple[float, int]]:
+        """
+        Distribution of which alive player of role `second` is picked, as
+        (probability, n) pairs, when the first alive player of role `first`
+        has already been picked independently. Within the same role, the
+        second pick hits the same player 1/count of the time and another one
+        otherwise.
+        """
+        count = state.alive[SOLVER_ROLES.index(second)]
+        if first != second or count < 2:
+            return [(1.0, 0)]
+        return [(1 / count, 0), ((count - 1) / count, 1)]
+
+    def _successors(self, state: SolverState) -> Iterator[Tuple[float, Game]]:
+        """Yield (probability, game) pairs right before the next `state_switch`."""
+        if state.morning:
+            for prob, role in self._targets(state, ()):
+                game = build_game(state)
+                game.process_morning_voting_result([_nth_alive(game, role)])
+                yield prob, game
+            return
+        witch_alive = state.alive[SOLVER_ROLES.index(Role.WITCH)] > 0
+        save = self.policy.witch_save if witch_alive and state.antidote else 0.0
+        poison = self.policy.witch_poison if witch_alive and state.poison else 0.0
+        for prob, victim in self._targets(state, (Role.WEREWOLF,)):
+            if save:
+                game = build_game(state)
+                victim_id = _nth_alive(game, victim)
+                game.process_werewolf_voting_result([victim_id])
+                game.process_witch_saving(victim_id)
+                yield prob * save, game
+            rest = prob * (1.0 - save)
+            if rest and poison:
+                for target_prob, target in self._targets(state, (Role.WITCH,)):
+                    for pick_prob, n in self._picks(state, victim, target):
+                        game = build_game(state)
+                        game.process_werewolf_voting_result([_nth_alive(game, victim)])
+                        game.process_witch_killing(_nth_alive(game, target, n))
+                        yield rest * poison * target_prob * pick_prob, game
+            if rest * (1.0 - poison):
+                game = build_game(state)
+                game.process_werewolf_voting_result([_nth_alive(game, victim)])
+                yield rest * (1.0 - poison), game
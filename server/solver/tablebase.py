@@ -0,0 +1,186 @@
+"""
+Contains the endgame tablebase: the solver results stored in a compact,
+memory-mapped file that can be queried in O(1).
+
+Build one from the `server` directory:
+    python -m solver.tablebase six_player.tb --witch-save 1.0 --witch-poison 0.5
+
+File layout (little endian):
+    header: magic, version, role counts (one byte per role of SOLVER_ROLES),
+            witch_save, witch_poison, zero padding to a multiple of 8 bytes
+    body:   one float64 per state, indexed by `state_index`
+
+On little endian hosts the body is read in place through a memoryview; other
+hosts decode each value with `struct`.
+"""
+
+import argparse
+import mmap
+import struct
+import sys
+from itertools import product
+from math import prod
+from types import TracebackType
+from typing import Dict, Iterator, List, Optional, Tuple, Type
+
+from game_logic.game import Game, GameState
+from game_logic.player import Role
+from game_logic.result import GameResult
+from solver.game_solver import (
+    SIX_PLAYER_ROLES,
+    SOLVER_ROLES,
+    GameSolver,
+    Policy,
+    SolverState,
+    canonicalize,
+)
+
+MAGIC = b"WWTB"
+VERSION = 1
+_HEADER = struct.Struct(f"<4sH{len(SOLVER_ROLES)}Bdd")
+_VALUE = struct.Struct("<d")
+# the body starts 8-byte aligned so it can be viewed as doubles in place
+_BODY_OFFSET = -(-_HEADER.size // _VALUE.size) * _VALUE.size
+
+
+def _radices(counts: Tuple[int, ...]) -> Tuple[int, ...]:
+    """The radix of each field of the state index."""
+    # alive count per role, then antidote, poison and morning
+    return tuple(count + 1 for count in counts) + (2, 2, 2)
+
+
+def state_index(state: SolverState, counts: Tuple[int, ...]) -> int:
+    """
+    Encode a state as a mixed-radix number, given the initial count per role.
+    Raises:
+    ValueError: if the state does not fit in the config.
+    """
+    digits = state.alive + (int(state.antidote), int(state.poison), int(state.morning))
+    index = 0
+    for digit, radix in zip(digits, _radices(counts)):
+        if digit >= radix:
+            raise ValueError(f"State {state} does not fit in config {counts}")
+        index = index * radix + digit
+    return index
+
+
+def iter_states(counts: Tuple[int, ...]) -> Iterator[SolverState]:
+    """Yield every state of a config in `state_index` order."""
+    for digits in product(*(range(radix) for radix in _radices(counts))):
+        *alive, antidote, poison, morning = digits
+        yield SolverState(tuple(alive), bool(antidote), bool(poison), bool(morning))
+
+
+def _role_counts(roles: Dict[Role, int]) -> Tuple[int, ...]:
+    """Convert a role count mapping into a tuple ordered by SOLVER_ROLES."""
+    unsupported = set(roles) - set(SOLVER_ROLES)
+    if unsupported:
+        raise ValueError(f"Roles {unsupported} are not supported by the solver")
+    return tuple(roles.get(role, 0) for role in SOLVER_ROLES)
+
+
+def write_tablebase(
+    path: str,
+    roles: Optional[Dict[Role, int]] = None,
+    policy: Policy = Policy(),
+) -> int:
+    """
+    Solve every state of a config and write the tablebase to `path`.
+    Returns:
+    int: the number of states written.
+    """
+    counts = _role_counts(roles or SIX_PLAYER_ROLES)
+    solver = GameSolver(policy)
+    written = 0
+    with open(path, "wb") as file:
+        file.write(
+            _HEADER.pack(
+                MAGIC, VERSION, *counts, policy.witch_save, policy.witch_poison
+            )
+        )
+        file.write(bytes(_BODY_OFFSET - _HEADER.size))
+        for state in iter_states(counts):
+            file.write(_VALUE.pack(solver.solve(state)))
+            written += 1
+    return written
+
+
+class Tablebase:
+    """A read-only, memory-mapped tablebase."""
+
+    def __init__(self, path: str) -> None:
+        """
+        Open a tablebase file.
+        Raises:
+        ValueError: if the file is not a tablebase of a supported version.
+        """
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < _BODY_OFFSET:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a tablebase")
+        magic, version, *counts, save, poison = _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a version {VERSION} tablebase")
+        self.counts: Tuple[int, ...] = tuple(counts)
+        self.policy = Policy(save, poison)
+        self._size = prod(_radices(self.counts))
+        if len(self._mmap) != _BODY_OFFSET + self._size * _VALUE.size:
+            self._mmap.close()
+            raise ValueError(f"{path} has a body of the wrong length")
+        self._values: Optional[memoryview] = None
+        if sys.byteorder == "little":
+            self._values = memoryview(self._mmap)[_BODY_OFFSET:].cast("d")
+
+    def __enter__(self) -> "Tablebase":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def close(self) -> None:
+        """Release the memory map."""
+        if self._values is not None:
+            self._values.release()
+        self._mmap.close()
+
+    def lookup(self, state: SolverState) -> float:
+        """Get the probability that the villagers win from `state`."""
+        index = state_index(state, self.counts)
+        if self._values is not None:
+            return self._values[index]
+        offset = _BODY_OFFSET + index * _VALUE.size
+        return _VALUE.unpack_from(self._mmap, offset)[0]
+
+    def lookup_game(self, game: Game) -> float:
+        """Get the probability that the villagers win from a live game."""
+        # pylint: disable=protected-access
+        if game._state == GameState.FINISHED:
+            return 1.0 if game.get_result() == GameResult.VILLAGERS_WIN else 0.0
+        return self.lookup(canonicalize(game))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Build the tablebase of the 6 player config."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("path")
+    parser.add_argument("--witch-save", type=float, default=Policy.witch_save)
+    parser.add_argument("--witch-poison", type=float, default=Policy.witch_poison)
+    args = parser.parse_args(argv)
+    written = write_tablebase(
+        args.path, policy=Policy(args.witch_save, args.witch_poison)
+    )
+    print(f"wrote {written} states to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
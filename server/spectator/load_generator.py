@@ -0,0 +1,146 @@
+"""
+Local load generator for the spectator gateway.
+
+Run it from the `server` directory:
+    python -m spectator.load_generator --games 4 --viewers 5000 --duration 5
+"""
+
+import argparse
+import asyncio
+import resource
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+from spectator.spectator_gateway import SpectatorGateway, Viewer
+
+
+@dataclass
+class LoadReport:
+    """The result of a load run."""
+
+    viewers: int
+    events_published: int
+    frames_delivered: int
+    resyncs: int
+    slow_drops: int
+    elapsed: float
+    peak_rss_kb: int
+
+    def __str__(self) -> str:
+        return (
+            f"viewers={self.viewers} events={self.events_published} "
+            f"frames={self.frames_delivered} "
+            f"({self.frames_delivered / self.elapsed:.0f}/s) "
+            f"resyncs={self.resyncs} slow_drops={self.slow_drops} "
+            f"elapsed={self.elapsed:.2f}s peak_rss={self.peak_rss_kb}KB"
+        )
+
+
+async def _consume(viewer: Viewer, delay: float, counters: List[int]) -> None:
+    """Consume frames of a viewer, sleeping `delay` seconds after each of them."""
+    while True:
+        frame = await viewer.next_frame()
+        if frame is None:
+            return
+        counters[0] += 1
+        if frame.snapshot is not None:
+            counters[1] += 1
+        if delay:
+            await asyncio.sleep(delay)
+
+
+async def _produce(
+    gateway: SpectatorGateway, game_id: str, event_hz: float, duration: float
+) -> int:
+    """Publish events of a game at `event_hz` for `duration` seconds."""
+    published = 0
+    end = time.monotonic() + duration
+    while time.monotonic() < end:
+        published = gateway.publish(game_id, {"type": "speech", "n": published})
+        if published % 32 == 0:
+            gateway.set_snapshot(game_id, {"day": published // 32, "seq": published})
+        await asyncio.sleep(1.0 / event_hz)
+    return published
+
+
+# pylint: disable=too-many-arguments,too-many-locals
+async def run_load(
+    *,
+    games: int = 1,
+    viewers: int = 1000,
+    duration: float = 2.0,
+    event_hz: float = 50.0,
+    max_hz: float = 10.0,
+    slow_ratio: float = 0.1,
+    gateway: Optional[SpectatorGateway] = None,
+) -> LoadReport:
+    """
+    Run `viewers` spectators spread over `games` games against one gateway.
+    A `slow_ratio` share of the viewers consumes far below the frame rate and
+    should be dropped to snapshot resync rather than buffered.
+    """
+    gateway = gateway or SpectatorGateway(max_hz=max_hz)
+    game_ids = [f"game-{i}" for i in range(games)]
+    counters = [0, 0]
+    subscribed = [gateway.subscribe(game_ids[i % games]) for i in range(viewers)]
+    slow_every = int(1 / slow_ratio) if slow_ratio > 0 else 0
+    consumers = [
+        asyncio.create_task(
+            _consume(
+                viewer,
+                duration if slow_every and i % slow_every == 0 else 0.0,
+                counters,
+            )
+        )
+        for i, viewer in enumerate(subscribed)
+    ]
+    stop = asyncio.Event()
+    flusher = asyncio.create_task(gateway.run(stop))
+    start = time.monotonic()
+    published = await asyncio.gather(
+        *(_produce(gateway, game_id, event_hz, duration) for game_id in game_ids)
+    )
+    elapsed = time.monotonic() - start
+    stop.set()
+    await flusher
+    slow_drops = sum(viewer.dropped_count for viewer in subscribed)
+    for game_id in game_ids:
+        gateway.close_game(game_id)
+    await asyncio.gather(*consumers)
+    return LoadReport(
+        viewers=viewers,
+        events_published=sum(published),
+        frames_delivered=counters[0],
+        resyncs=counters[1],
+        slow_drops=slow_drops,
+        elapsed=elapsed,
+        peak_rss_kb=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Parse the arguments and print the report of a load run."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--games", type=int, default=1)
+    parser.add_argument("--viewers", type=int, default=1000)
+    parser.add_argument("--duration", type=float, default=2.0)
+    parser.add_argument("--event-hz", type=float, default=50.0)
+    parser.add_argument("--max-hz", type=float, default=10.0)
+    parser.add_argument("--slow-ratio", type=float, default=0.1)
+    args = parser.parse_args(argv)
+    report = asyncio.run(
+        run_load(
+            games=args.games,
+            viewers=args.viewers,
+            duration=args.duration,
+            event_hz=args.event_hz,
+            max_hz=args.max_hz,
+            slow_ratio=args.slow_ratio,
+        )
+    )
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
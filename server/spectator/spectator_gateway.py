@@ -0,0 +1,281 @@
+"""Contains the Spectator Gateway Class"""
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+Event = Dict[str, Any]
+Snapshot = Dict[str, Any]
+
+
+@dataclass(frozen=True)
+class Frame:
+    """
+    A coalesced update sent to a viewer.
+    If `snapshot` is set, the viewer must drop its local state and rebuild it
+    from the snapshot; `events` then only holds events newer than the snapshot.
+    """
+
+    game_id: str
+    seq: int  # sequence number of the last event covered by this frame
+    events: Tuple[Event, ...]
+    snapshot: Optional[Snapshot] = None
+
+
+class GameChannel:
+    """Holds the ring buffer of recent events and the latest snapshot of a game."""
+
+    def __init__(self, game_id: str, ring_size: int) -> None:
+        self.game_id = game_id
+        # the ring only keeps the newest `ring_size` events; viewers that fall
+        # behind it are resynced from the snapshot instead.
+        self._ring: Deque[Tuple[int, Event]] = deque(maxlen=ring_size)
+        self._seq: int = 0
+        self._snapshot: Snapshot = {}
+        self._snapshot_seq: int = 0
+
+    @property
+    def seq(self) -> int:
+        """The sequence number of the newest event."""
+        return self._seq
+
+    def publish(self, event: Event) -> int:
+        """
+        Append an event to the ring buffer.
+        Returns:
+        int: the sequence number assigned to the event.
+        """
+        self._seq += 1
+        self._ring.append((self._seq, event))
+        return self._seq
+
+    def set_snapshot(self, snapshot: Snapshot) -> None:
+        """Replace the snapshot, which is the full state as of the newest event."""
+        self._snapshot = snapshot
+        self._snapshot_seq = self._seq
+
+    def events_since(self, seq: int) -> Optional[Tuple[Event, ...]]:
+        """
+        Get the events newer than `seq`.
+        Returns:
+        Optional[Tuple[Event, ...]]: the events, or None if some of them have
+        already been evicted from the ring buffer.
+        """
+        if seq >= self._seq:
+            return ()
+        if not self._ring or self._ring[0][0] > seq + 1:
+            return None
+        # the ring is contiguous, so the offset of `seq + 1` is known directly
+        start = seq + 1 - self._ring[0][0]
+        return tuple(event for _, event in islice(self._ring, start, None))
+
+    def resync_frame(self) -> Optional[Frame]:
+        """
+        Build a frame carrying the snapshot plus the events published after it.
+        Returns:
+        Optional[Frame]: the frame, or None if some events between the snapshot
+        and now have already been evicted; the resync then has to wait for a
+        newer snapshot.
+        """
+        events = self.events_since(self._snapshot_seq)
+        if events is None:
+            return None
+        return Frame(self.game_id, self._seq, events, self._snapshot)
+
+
+# pylint: disable=too-many-instance-attributes
+class Viewer:
+    """A spectator subscribed to one game."""
+
+    def __init__(self, viewer_id: int, game_id: str, max_pending: int) -> None:
+        self.id = viewer_id
+        self.game_id = game_id
+        self.last_seq: int = 0
+        self.needs_resync: bool = True
+        self.next_due: float = 0.0
+        self.dropped_count: int = 0
+        self.closed: bool = False
+        self._max_pending = max_pending
+        self._pending: Deque[Frame] = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+
+    @property
+    def pending_count(self) -> int:
+        """The number of frames waiting to be consumed."""
+        return len(self._pending)
+
+    def push(self, frame: Frame) -> bool:
+        """
+        Queue a frame for the viewer.
+        Returns:
+        bool: False if the viewer is too slow; its queue is then cleared and the
+        viewer is scheduled for a snapshot resync.
+        """
+        if len(self._pending) >= self._max_pending:
+            self._pending.clear()
+            self.needs_resync = True
+            self.dropped_count += 1
+            return False
+        self._pending.append(frame)
+        self.last_seq = frame.seq
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return True
+
+    def poll(self) -> Optional[Frame]:
+        """Take the oldest pending frame without waiting."""
+        if not self._pending:
+            return None
+        return self._pending.popleft()
+
+    async def next_frame(self) -> Optional[Frame]:
+        """
+        Wait for the next frame.
+        Returns:
+        Optional[Frame]: the frame, or None if the viewer has been closed.
+        """
+        while not self._pending:
+            if self.closed:
+                return None
+            if self._wakeup is None:
+                self._wakeup = asyncio.Event()
+            self._wakeup.clear()
+            await self._wakeup.wait()
+        return self._pending.popleft()
+
+    def close(self) -> None:
+        """Close the viewer and wake up the consumer."""
+        self.closed = True
+        self._pending.clear()
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+
+class SpectatorGateway:
+    """
+    Fans game events out to spectators.
+    Events are kept once per game in a ring buffer and viewers only hold a
+    cursor into it. `flush` coalesces everything published since a viewer's
+    last frame into a single frame, at most `max_hz` times per second per
+    viewer. A viewer that does not consume its frames is not buffered for:
+    once `max_pending` frames are waiting, they are dropped and the viewer gets
+    a snapshot on the next flush. Producers should call `set_snapshot` at least
+    once every `ring_size` events, as a resync needs the events published
+    since the snapshot to still be in the ring.
+    """
+
+    def __init__(
+        self,
+        max_hz: float = 10.0,
+        ring_size: int = 256,
+        max_pending: int = 4,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_hz <= 0:
+            raise ValueError("max_hz must be positive")
+        if ring_size <= 0 or max_pending <= 0:
+            raise ValueError("ring_size and max_pending must be positive")
+        self._interval = 1.0 / max_hz
+        self._ring_size = ring_size
+        self._max_pending = max_pending
+        self._clock = clock
+        self._channels: Dict[str, GameChannel] = {}
+        self._viewers: Dict[str, Dict[int, Viewer]] = {}
+        self._next_viewer_id: int = 1
+
+    @property
+    def interval(self) -> float:
+        """The minimal time between two frames of a viewer, in seconds."""
+        return self._interval
+
+    def channel(self, game_id: str) -> GameChannel:
+        """Get the channel of a game, creating it if needed."""
+        channel = self._channels.get(game_id)
+        if channel is None:
+            channel = GameChannel(game_id, self._ring_size)
+            self._channels[game_id] = channel
+            self._viewers[game_id] = {}
+        return channel
+
+    def publish(self, game_id: str, event: Event) -> int:
+        """Publish an event of a game. Returns the sequence number of the event."""
+        return self.channel(game_id).publish(event)
+
+    def set_snapshot(self, game_id: str, snapshot: Snapshot) -> None:
+        """Set the snapshot used to (re)sync viewers of a game."""
+        self.channel(game_id).set_snapshot(snapshot)
+
+    def close_game(self, game_id: str) -> None:
+        """Drop a finished game and close all of its viewers."""
+        for viewer in self._viewers.pop(game_id, {}).values():
+            viewer.close()
+        self._channels.pop(game_id, None)
+
+    def subscribe(self, game_id: str) -> Viewer:
+        """Subscribe a new viewer, which will first receive a snapshot."""
+        self.channel(game_id)
+        viewer = Viewer(self._next_viewer_id, game_id, self._max_pending)
+        self._next_viewer_id += 1
+        self._viewers[game_id][viewer.id] = viewer
+        return viewer
+
+    def unsubscribe(self, viewer: Viewer) -> None:
+        """Remove a viewer."""
+        self._viewers.get(viewer.game_id, {}).pop(viewer.id, None)
+        viewer.close()
+
+    def viewer_count(self, game_id: Optional[str] = None) -> int:
+        """Count the viewers of one game, or of all games if `game_id` is None."""
+        if game_id is not None:
+            return len(self._viewers.get(game_id, {}))
+        return sum(len(viewers) for viewers in self._viewers.values())
+
+    def flush(self) -> int:
+        """
+        Send a coalesced frame to every viewer that is due and has something new.
+        Returns:
+        int: the number of frames pushed.
+        """
+        now = self._clock()
+        pushed = 0
+        for game_id, viewers in self._viewers.items():
+            channel = self._channels[game_id]
+            # viewers at the same cursor share the same frame object
+            frames: Dict[int, Frame] = {}
+            resync: Optional[Frame] = None
+            resync_built = False
+            for viewer in viewers.values():
+                if viewer.next_due > now:
+                    continue
+                if not viewer.needs_resync and viewer.last_seq >= channel.seq:
+                    continue
+                frame = None if viewer.needs_resync else frames.get(viewer.last_seq)
+                if frame is None and not viewer.needs_resync:
+                    events = channel.events_since(viewer.last_seq)
+                    if events is not None:
+                        frame = Frame(game_id, channel.seq, events)
+                        frames[viewer.last_seq] = frame
+                if frame is None:
+                    if not resync_built:
+                        resync = channel.resync_frame()
+                        resync_built = True
+                    if resync is None:
+                        # never send a stale snapshot, which would move the
+                        # viewer backwards; wait for a reachable one instead
+                        viewer.needs_resync = True
+                        continue
+                    frame = resync
+                if viewer.push(frame):
+                    viewer.needs_resync = False
+                    pushed += 1
+                viewer.next_due = now + self._interval
+        return pushed
+
+    async def run(self, stop: Optional[asyncio.Event] = None) -> None:
+        """Flush at `max_hz` until `stop` is set."""
+        while stop is None or not stop.is_set():
+            self.flush()
+            await asyncio.sleep(self._interval)
@@ -0,0 +1,101 @@
+"""
+Startup-time benchmark for the server entry point.
+
+Spawns `main.py` cold several times per command and reports the best wall
+time and the `-X importtime` breakdown. Run it from the `server` directory:
+    python startup_benchmark.py --runs 10
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+MAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+COMMANDS: List[List[str]] = [
+    ["--help"],
+    ["simulate", "--games", "0"],
+    ["tournament", "--games", "0"],
+]
+
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """
+    Parse the `-X importtime` output.
+    Returns:
+    Dict[str, int]: the cumulative import time in microseconds of every module.
+    """
+    modules: Dict[str, int] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if cumulative.strip().isdigit():
+            modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def top_level_import_time(stderr: str) -> int:
+    """The total import time in microseconds, summed over top-level imports."""
+    total = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        # nested imports are indented further than the single leading space
+        if cumulative.strip().isdigit() and not name.startswith("  "):
+            total += int(cumulative)
+    return total
+
+
+def run_importtime(args: List[str]) -> str:
+    """Run `main.py` once with `-X importtime` and return its stderr."""
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", MAIN, *args],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=os.path.dirname(MAIN),
+    )
+    return process.stderr
+
+
+def measure(args: List[str], runs: int) -> Tuple[float, str]:
+    """
+    Spawn `main.py` `runs` times.
+    Returns:
+    Tuple[float, str]: the best wall time in seconds and the importtime output
+    of the last run.
+    """
+    best = float("inf")
+    stderr = ""
+    for _ in range(runs):
+        start = time.perf_counter()
+        stderr = run_importtime(args)
+        best = min(best, time.perf_counter() - start)
+    return best, stderr
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Print the startup time of every command in COMMANDS."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args(argv)
+    for command in COMMANDS:
+        wall, stderr = measure(command, args.runs)
+        modules = parse_importtime(stderr)
+        heaviest = sorted(modules.items(), key=lambda item: item[1], reverse=True)
+        print(
+            f"main.py {' '.join(command)}: wall={wall * 1000:.1f}ms "
+            f"imports={top_level_import_time(stderr) / 1000:.1f}ms"
+        )
+        for name, cumulative in heaviest[: args.top]:
+            print(f"    {cumulative / 1000:7.1f}ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""Tests for Coordinator and the shard worker."""
+
+import asyncio
+import multiprocessing
+
+import pytest
+from game_controller.coordinator import Coordinator, Job
+from game_controller.shard_worker import (
+    decode_message,
+    encode_message,
+    run_task,
+    run_worker,
+)
+from game_controller.simulator import SIMULATION_CONFIGS, simulate_batch
+
+
+async def _fake_worker(host, port, reply=None):
+    """Connect, take one task, optionally send `reply`, then disconnect."""
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(encode_message({"type": "hello", "worker": "fake"}))
+    task = decode_message(await reader.readline())
+    if reply is not None:
+        writer.write(encode_message(reply(task)))
+        await writer.drain()
+    writer.close()
+    await writer.wait_closed()
+    return task
+
+
+async def _run_with_workers(coordinator, count, before=None):
+    """Run the coordinator with `count` worker processes."""
+    host, port = await coordinator.start()
+    if before is not None:
+        await before(host, port)
+    context = multiprocessing.get_context("spawn")
+    workers = [
+        context.Process(target=run_worker, args=(host, port)) for _ in range(count)
+    ]
+    for worker in workers:
+        worker.start()
+    results = await coordinator.wait()
+    for worker in workers:
+        await asyncio.to_thread(worker.join)
+        assert worker.exitcode == 0
+    return results
+
+
+class TestCoordinator:
+    """Test cases for Coordinator."""
+
+    def test_invalid_arguments(self):
+        """Test that unknown configs and empty batches are rejected."""
+        with pytest.raises(ValueError):
+            Coordinator([Job("nope", 0, 10)])
+        with pytest.raises(ValueError):
+            Coordinator([Job("six-player", 0, 10)], batch_size=0)
+
+    def test_sharding(self):
+        """Test that jobs are split into batches covering every seed."""
+        coordinator = Coordinator(
+            [Job("six-player", 0, 25), Job("six-player-no-potions", 5, 10)],
+            batch_size=10,
+        )
+        assert coordinator.task_count == 4
+
+    def test_multiple_workers(self):
+        """Test that results of several workers merge into the full run."""
+        jobs = [Job("six-player", 0, 300), Job("six-player-no-potions", 0, 100)]
+        coordinator = Coordinator(jobs, batch_size=40)
+        results = asyncio.run(_run_with_workers(coordinator, 3))
+        for job in jobs:
+            assert results[job.config_id] == simulate_batch(
+                range(job.start, job.stop), SIMULATION_CONFIGS[job.config_id]
+            )
+
+    def test_dead_worker_is_rebalanced(self):
+        """Test that the task of a worker that died goes to another worker."""
+        coordinator = Coordinator([Job("six-player", 0, 100)], batch_size=25)
+        lost = []
+
+        async def die(host, port):
+            lost.append(await _fake_worker(host, port))
+
+        results = asyncio.run(_run_with_workers(coordinator, 1, die))
+        assert lost[0]["type"] == "task"
+        assert coordinator.requeued_count == 1
+        assert results["six-player"] == simulate_batch(range(100))
+
+    def test_bogus_result_is_not_counted(self):
+        """Test that a result which does not match its task is discarded."""
+        coordinator = Coordinator([Job("six-player", 0, 50)], batch_size=50)
+
+        async def lie(host, port):
+            await _fake_worker(
+                host,
+                port,
+                lambda task: {
+                    "type": "result",
+                    "task_id": task["task_id"],
+                    "games": 1,
+                    "villager_wins": 1,
+                    "total_days": 1,
+                },
+            )
+
+        results = asyncio.run(_run_with_workers(coordinator, 1, lie))
+        assert coordinator.requeued_count == 1
+        assert results["six-player"] == simulate_batch(range(50))
+
+    def test_wrongly_typed_result_is_not_counted(self):
+        """Test that a result with wrong field types is requeued, not merged."""
+        coordinator = Coordinator([Job("six-player", 0, 10)], batch_size=10)
+
+        async def lie(host, port):
+            await _fake_worker(
+                host,
+                port,
+                lambda task: {
+                    "type": "result",
+                    "task_id": task["task_id"],
+                    "games": 10,
+                    "villager_wins": "x",
+                    "total_days": 1,
+                },
+            )
+
+        results = asyncio.run(_run_with_workers(coordinator, 1, lie))
+        assert coordinator.requeued_count == 1
+        assert results["six-player"] == simulate_batch(range(10))
+
+    def test_silent_connection_does_not_block_wait(self):
+        """Test that a connection which never says hello is dropped at the end."""
+        coordinator = Coordinator([Job("six-player", 0, 10)], batch_size=10)
+        silent = []
+
+        async def connect(host, port):
+            silent.append(await asyncio.open_connection(host, port))
+
+        results = asyncio.run(
+            asyncio.wait_for(_run_with_workers(coordinator, 1, connect), 30)
+        )
+        assert results["six-player"] == simulate_batch(range(10))
+
+    def test_silent_worker_is_rebalanced(self):
+        """Test that a worker which stops talking but stays connected is lost."""
+        coordinator = Coordinator(
+            [Job("six-player", 0, 20)], batch_size=10, heartbeat_timeout=0.5
+        )
+        silent = []
+
+        async def hang(host, port):
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(encode_message({"type": "hello", "worker": "silent"}))
+            silent.append(decode_message(await reader.readline()))
+            silent.append(writer)
+
+        results = asyncio.run(
+            asyncio.wait_for(_run_with_workers(coordinator, 1, hang), 30)
+        )
+        assert silent[0]["type"] == "task"
+        assert coordinator.requeued_count == 1
+        assert results["six-player"] == simulate_batch(range(20))
+
+    def test_heartbeats_keep_a_slow_worker(self):
+        """Test that a worker sending heartbeats outlives the heartbeat timeout."""
+        coordinator = Coordinator(
+            [Job("six-player", 0, 10)], batch_size=10, heartbeat_timeout=0.5
+        )
+
+        async def work(host, port):
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(encode_message({"type": "hello", "worker": "slow"}))
+            task = decode_message(await reader.readline())
+            for _ in range(5):
+                await asyncio.sleep(0.2)
+                heartbeat = {"type": "heartbeat", "task_id": task["task_id"]}
+                writer.write(encode_message(heartbeat))
+            writer.write(encode_message(run_task(task)))
+            assert decode_message(await reader.readline()) == {"type": "done"}
+            writer.close()
+
+        async def run():
+            host, port = await coordinator.start()
+            worker = asyncio.create_task(work(host, port))
+            results = await coordinator.wait()
+            await worker
+            return results
+
+        results = asyncio.run(asyncio.wait_for(run(), 30))
+        assert coordinator.requeued_count == 0
+        assert results["six-player"] == simulate_batch(range(10))
+
+    def test_worker_without_coordinator(self):
+        """Test that a worker gives up when nothing listens."""
+        with pytest.raises(OSError):
+            run_worker("127.0.0.1", 9, connect_timeout=0)
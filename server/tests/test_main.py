@@ -0,0 +1,90 @@
+"""Tests for the server entry point."""
+
+import json
+
+import pytest
+from main import main
+from startup_benchmark import parse_importtime, run_importtime, top_level_import_time
+
+# Budget for all imports done while starting `main.py --help`, in microseconds.
+# A cold start is around 30ms today; the budget leaves room for slow CI machines.
+IMPORT_BUDGET_US = 150_000
+
+# Subsystems that must only be imported by the subcommands that use them.
+HEAVY_MODULES = [
+    "asyncio",
+    "json",
+    "mmap",
+    "multiprocessing",
+    "typing",
+    "agent_server.agent_server",
+    "game_controller.simulator",
+    "game_logic.game",
+    "solver.game_solver",
+    "spectator.spectator_gateway",
+]
+
+
+class TestStartup:
+    """Test cases for the startup time of the entry point."""
+
+    def test_help_import_budget(self):
+        """Test that `--help` imports no subsystem and stays within budget."""
+        stderr = run_importtime(["--help"])
+        modules = parse_importtime(stderr)
+        assert "argparse" in modules
+        assert not [name for name in HEAVY_MODULES if name in modules]
+        assert top_level_import_time(stderr) < IMPORT_BUDGET_US
+
+    def test_simulate_is_lazy(self):
+        """Test that `simulate` does not import the other subsystems."""
+        modules = parse_importtime(run_importtime(["simulate", "--games", "0"]))
+        assert "game_controller.simulator" in modules
+        for name in ("asyncio", "multiprocessing", "spectator.spectator_gateway"):
+            assert name not in modules
+
+
+class TestMain:
+    """Test cases for the subcommands."""
+
+    def test_simulate(self, capsys):
+        """Test that preforked and in-process simulations agree."""
+        assert main(["simulate", "--games", "200"]) == 0
+        single = capsys.readouterr().out
+        assert main(["simulate", "--games", "200", "--prefork", "2"]) == 0
+        assert capsys.readouterr().out == single
+        assert single.startswith("games=200 ")
+
+    def test_tournament(self, capsys):
+        """Test that every policy gets a rank."""
+        argv = ["tournament", "--games", "50", "--policy", "1,0", "--policy", "0,1"]
+        assert main(argv) == 0
+        lines = capsys.readouterr().out.splitlines()
+        assert [line[:2] for line in lines] == ["1.", "2."]
+
+    def test_replay(self, tmp_path, capsys):
+        """Test that events close in time are coalesced into one frame."""
+        path = tmp_path / "log.jsonl"
+        path.write_text('{"timestamp": 0}\n{"timestamp": 10}\n{"timestamp": 20}\n')
+        assert main(["replay", str(path)]) == 0
+        lines = capsys.readouterr().out.splitlines()
+        assert len(lines) == 2
+        assert lines[-1].startswith('{"seq": 3')
+        assert "snapshot" in json.loads(lines[0])
+
+    def test_replay_long_log(self, tmp_path, capsys):
+        """Test that a log longer than the default ring loses no event."""
+        path = tmp_path / "log.jsonl"
+        path.write_text("".join(f'{{"n": {i}}}\n' for i in range(300)))
+        assert main(["replay", str(path)]) == 0
+        frames = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        events = [event["n"] for frame in frames for event in frame["events"]]
+        assert events == list(range(300))
+        assert [frame["seq"] for frame in frames] == sorted(
+            frame["seq"] for frame in frames
+        )
+
+    def test_invalid_policy(self):
+        """Test that a malformed policy is rejected by the parser."""
+        with pytest.raises(SystemExit):
+            main(["simulate", "--policy", "1"])
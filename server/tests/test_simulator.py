@@ -0,0 +1,47 @@
+"""Tests for the simulator and the preforked worker pool."""
+
+from functools import partial
+
+import pytest
+from game_controller.prefork import run_preforked, split_range
+from game_controller.simulator import BatchSummary, simulate_batch, simulate_game
+from game_logic.result import GameResult
+from solver.game_solver import Policy
+
+
+class TestSimulator:
+    """Test cases for the simulator."""
+
+    def test_simulate_game_is_deterministic(self):
+        """Test that a seed always gives the same game."""
+        assert simulate_game(7) == simulate_game(7)
+        result, days = simulate_game(7)
+        assert isinstance(result, GameResult)
+        assert days >= 1
+
+    def test_merge(self):
+        """Test that merged shards equal a single batch."""
+        merged = BatchSummary()
+        merged.merge(simulate_batch(range(0, 30)))
+        merged.merge(simulate_batch(range(30, 100)))
+        assert merged == simulate_batch(range(100))
+        assert merged.villager_win_rate == merged.villager_wins / 100
+
+
+class TestPrefork:
+    """Test cases for the preforked worker pool."""
+
+    def test_split_range(self):
+        """Test that shards cover the range exactly once."""
+        shards = split_range(5, 15, 3)
+        assert [len(shard) for shard in shards] == [4, 3, 3]
+        assert [seed for shard in shards for seed in shard] == list(range(5, 15))
+        assert split_range(0, 2, 4) == [range(0, 1), range(1, 2)]
+        with pytest.raises(ValueError):
+            split_range(0, 1, 0)
+
+    def test_run_preforked(self):
+        """Test that forked workers give the same results as in-process runs."""
+        func = partial(simulate_batch, policy=Policy(0.5, 0.5))
+        shards = split_range(0, 40, 4)
+        assert run_preforked(func, shards, 2) == run_preforked(func, shards, 1)
@@ -0,0 +1,166 @@
+"""Tests for GameSolver and Tablebase."""
+
+import pytest
+from game_controller.simulator import simulate_batch
+from game_logic.game import Game, GameState
+from game_logic.player import Player, Role
+from game_logic.result import GameResult
+from solver.game_solver import (
+    SIX_PLAYER_ROLES,
+    GameSolver,
+    Policy,
+    SolverState,
+    build_game,
+    canonicalize,
+)
+from solver.tablebase import Tablebase, iter_states, state_index, write_tablebase
+
+INITIAL_STATE = SolverState((2, 2, 1, 1), True, True, False)
+
+SIX_PLAYERS = [Role.VILLAGER] * 2 + [Role.WEREWOLF] * 2 + [Role.PROPHET, Role.WITCH]
+
+
+def _play(policy, key, actions, memo):
+    """Apply `actions` as (method name, argument) pairs, then evaluate the result."""
+    # pylint: disable=protected-access,too-many-locals
+    alive, antidote, poison, morning = key
+    game = Game()
+    for i, role in enumerate(SIX_PLAYERS):
+        player = Player(i + 1, role)
+        player.is_alive = alive[i]
+        player.witch_antidote, player.witch_poison = antidote, poison
+        game._players.append(player)
+    game._state = GameState.MORNING if morning else GameState.EVENING
+    for method, argument in actions:
+        getattr(game, method)(argument)
+    game.state_switch()
+    if game._state == GameState.FINISHED:
+        return 1.0 if game.get_result() == GameResult.VILLAGERS_WIN else 0.0
+    witch = game._players[SIX_PLAYERS.index(Role.WITCH)]
+    next_key = (
+        tuple(p.is_alive for p in game._players),
+        witch.is_alive and witch.witch_antidote,
+        witch.is_alive and witch.witch_poison,
+        game._state == GameState.MORNING,
+    )
+    return _brute_force(policy, next_key, memo)
+
+
+def _brute_force(policy, key, memo):
+    """Villagers' win probability, enumerating every individual player pick."""
+    # pylint: disable=too-many-locals
+    if key in memo:
+        return memo[key]
+    alive, antidote, poison, morning = key
+    ids = [i + 1 for i in range(len(SIX_PLAYERS)) if alive[i]]
+    if morning:
+        value = sum(
+            _play(policy, key, [("process_morning_voting_result", [pid])], memo)
+            for pid in ids
+        ) / len(ids)
+        memo[key] = value
+        return value
+    witch_alive = alive[SIX_PLAYERS.index(Role.WITCH)]
+    save = policy.witch_save if witch_alive and antidote else 0.0
+    poison_prob = policy.witch_poison if witch_alive and poison else 0.0
+    victims = [pid for pid in ids if SIX_PLAYERS[pid - 1] != Role.WEREWOLF]
+    targets = [pid for pid in ids if SIX_PLAYERS[pid - 1] != Role.WITCH]
+    value = 0.0
+    for victim in victims:
+        kill = ("process_werewolf_voting_result", [victim])
+        if save:
+            actions = [kill, ("process_witch_saving", victim)]
+            value += save * _play(policy, key, actions, memo)
+        rest = 1.0 - save
+        if rest and poison_prob:
+            for target in targets:
+                actions = [kill, ("process_witch_killing", target)]
+                share = rest * poison_prob / len(targets)
+                value += share * _play(policy, key, actions, memo)
+        if rest * (1.0 - poison_prob):
+            value += rest * (1.0 - poison_prob) * _play(policy, key, [kill], memo)
+    value /= len(victims)
+    memo[key] = value
+    return value
+
+
+class TestGameSolver:
+    """Test cases for GameSolver."""
+
+    def test_canonicalize_roundtrip(self):
+        """Test that a built game canonicalizes back to its state."""
+        state = SolverState((1, 2, 0, 1), False, True, True)
+        assert canonicalize(build_game(state)) == state
+
+    def test_terminal_states(self):
+        """Test that finished states are won or lost with certainty."""
+        solver = GameSolver()
+        assert solver.solve(SolverState((2, 0, 1, 1), True, True, False)) == 1.0
+        assert solver.solve(SolverState((0, 1, 1, 1), True, True, True)) == 0.0
+
+    def test_morning_vote(self):
+        """Test a single vote: only eliminating the werewolf wins."""
+        solver = GameSolver()
+        assert solver.solve(SolverState((1, 1, 1, 0), False, False, True)) == (
+            pytest.approx(1 / 3)
+        )
+
+    @pytest.mark.parametrize(
+        "policy",
+        [Policy(), Policy(0.0, 1.0), Policy(0.5, 0.5), Policy(0.0, 0.0)],
+    )
+    def test_matches_brute_force(self, policy):
+        """Test the solver against a per-player enumeration of the 6 player game."""
+        expected = _brute_force(policy, ((True,) * 6, True, True, False), {})
+        assert GameSolver(policy).solve(INITIAL_STATE) == pytest.approx(expected)
+
+    def test_matches_simulator(self):
+        """Test the solver against the simulator within 4 standard errors."""
+        policy = Policy(witch_save=0.0, witch_poison=1.0)
+        expected = GameSolver(policy).solve(INITIAL_STATE)
+        games = 40000
+        summary = simulate_batch(range(games), policy)
+        error = (expected * (1 - expected) / games) ** 0.5
+        assert summary.villager_win_rate == pytest.approx(expected, abs=4 * error)
+
+
+class TestTablebase:
+    """Test cases for Tablebase."""
+
+    def test_state_index(self):
+        """Test that every state has a distinct index in iteration order."""
+        counts = (2, 2, 1, 1)
+        indexes = [state_index(state, counts) for state in iter_states(counts)]
+        assert indexes == list(range(len(indexes)))
+        with pytest.raises(ValueError):
+            state_index(SolverState((3, 2, 1, 1), True, True, False), counts)
+
+    def test_write_and_lookup(self, tmp_path):
+        """Test that the tablebase returns the solver values."""
+        path = str(tmp_path / "six.tb")
+        policy = Policy(witch_save=0.8, witch_poison=0.3)
+        written = write_tablebase(path, SIX_PLAYER_ROLES, policy)
+        solver = GameSolver(policy)
+        with Tablebase(path) as tablebase:
+            assert len(tablebase) == written
+            assert tablebase.policy == policy
+            assert tablebase.lookup(INITIAL_STATE) == solver.solve(INITIAL_STATE)
+            game = build_game(INITIAL_STATE)
+            game.state_switch()
+            assert tablebase.lookup_game(game) == solver.solve_game(game)
+
+    def test_invalid_file(self, tmp_path):
+        """Test that a file which is not a tablebase is rejected."""
+        path = tmp_path / "bad.tb"
+        path.write_bytes(b"x" * 64)
+        with pytest.raises(ValueError):
+            Tablebase(str(path))
+
+    def test_truncated_file(self, tmp_path):
+        """Test that a tablebase with a missing body is rejected."""
+        path = tmp_path / "six.tb"
+        write_tablebase(str(path))
+        data = path.read_bytes()
+        path.write_bytes(data[:-12])
+        with pytest.raises(ValueError):
+            Tablebase(str(path))
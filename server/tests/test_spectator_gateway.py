@@ -0,0 +1,163 @@
+"""Tests for SpectatorGateway."""
+
+import asyncio
+
+import pytest
+from spectator.load_generator import run_load
+from spectator.spectator_gateway import GameChannel, SpectatorGateway
+
+
+class FakeClock:
+    """A manually advanced clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestGameChannel:
+    """Test cases for GameChannel."""
+
+    def test_events_since(self):
+        """Test that events are sliced from the ring by sequence number."""
+        channel = GameChannel("g", ring_size=3)
+        for i in range(5):
+            channel.publish({"n": i})
+        assert channel.events_since(5) == ()
+        assert channel.events_since(3) == ({"n": 3}, {"n": 4})
+        assert channel.events_since(2) == ({"n": 2}, {"n": 3}, {"n": 4})
+        # event 2 has been evicted
+        assert channel.events_since(1) is None
+
+
+class TestSpectatorGateway:
+    """Test cases for SpectatorGateway."""
+
+    def test_invalid_arguments(self):
+        """Test that invalid limits are rejected."""
+        with pytest.raises(ValueError):
+            SpectatorGateway(max_hz=0)
+        with pytest.raises(ValueError):
+            SpectatorGateway(ring_size=0)
+
+    def test_first_frame_is_snapshot(self):
+        """Test that a new viewer is synced from the snapshot."""
+        gateway = SpectatorGateway()
+        gateway.publish("g", {"n": 1})
+        gateway.set_snapshot("g", {"day": 1})
+        gateway.publish("g", {"n": 2})
+        viewer = gateway.subscribe("g")
+        assert gateway.flush() == 1
+        frame = viewer.poll()
+        assert frame.snapshot == {"day": 1}
+        assert frame.events == ({"n": 2},)
+        assert frame.seq == 2
+
+    def test_coalescing_rate(self):
+        """Test that events are coalesced into at most one frame per interval."""
+        clock = FakeClock()
+        gateway = SpectatorGateway(max_hz=10, clock=clock)
+        viewer = gateway.subscribe("g")
+        gateway.flush()
+        viewer.poll()
+        for i in range(5):
+            gateway.publish("g", {"n": i})
+            clock.now += 0.01
+            gateway.flush()
+        assert viewer.poll() is None
+        clock.now = 0.1
+        gateway.flush()
+        frame = viewer.poll()
+        assert frame.events == tuple({"n": i} for i in range(5))
+        assert viewer.poll() is None
+
+    def test_frames_are_shared(self):
+        """Test that viewers at the same cursor receive the same frame object."""
+        clock = FakeClock()
+        gateway = SpectatorGateway(clock=clock)
+        viewers = [gateway.subscribe("g") for _ in range(3)]
+        gateway.flush()
+        for viewer in viewers:
+            viewer.poll()
+        gateway.publish("g", {"n": 1})
+        clock.now += 1
+        assert gateway.flush() == 3
+        frames = [viewer.poll() for viewer in viewers]
+        assert frames[0] is frames[1] is frames[2]
+
+    def test_slow_viewer_is_resynced(self):
+        """Test that a viewer with too many pending frames gets a snapshot."""
+        clock = FakeClock()
+        gateway = SpectatorGateway(max_pending=2, clock=clock)
+        viewer = gateway.subscribe("g")
+        for i in range(3):
+            gateway.publish("g", {"n": i})
+            gateway.set_snapshot("g", {"n": i})
+            clock.now += 1
+            gateway.flush()
+        assert viewer.pending_count == 0
+        assert viewer.dropped_count == 1
+        gateway.publish("g", {"n": 3})
+        clock.now += 1
+        gateway.flush()
+        frame = viewer.poll()
+        assert frame.snapshot == {"n": 2}
+        assert frame.events == ({"n": 3},)
+
+    def test_viewer_behind_ring_is_resynced(self):
+        """Test that a viewer whose cursor was evicted gets a snapshot."""
+        clock = FakeClock()
+        gateway = SpectatorGateway(ring_size=2, clock=clock)
+        viewer = gateway.subscribe("g")
+        gateway.flush()
+        viewer.poll()
+        for i in range(4):
+            gateway.publish("g", {"n": i})
+        gateway.set_snapshot("g", {"n": 3})
+        clock.now += 1
+        gateway.flush()
+        frame = viewer.poll()
+        assert frame.snapshot == {"n": 3}
+        assert frame.seq == 4
+
+    def test_viewer_behind_ring_waits_for_snapshot(self):
+        """Test that a stale snapshot never moves a viewer backwards."""
+        clock = FakeClock()
+        gateway = SpectatorGateway(ring_size=2, clock=clock)
+        viewer = gateway.subscribe("g")
+        gateway.flush()
+        viewer.poll()
+        for i in range(4):
+            gateway.publish("g", {"n": i})
+        clock.now += 1
+        assert gateway.flush() == 0
+        assert viewer.poll() is None
+        assert viewer.last_seq == 0
+        assert viewer.needs_resync
+        gateway.set_snapshot("g", {"n": 3})
+        gateway.publish("g", {"n": 4})
+        clock.now += 1
+        gateway.flush()
+        frame = viewer.poll()
+        assert frame.snapshot == {"n": 3}
+        assert frame.events == ({"n": 4},)
+        assert frame.seq == viewer.last_seq == 5
+
+    def test_close_game(self):
+        """Test that closing a game closes its viewers."""
+        gateway = SpectatorGateway()
+        viewer = gateway.subscribe("g")
+        gateway.close_game("g")
+        assert viewer.closed
+        assert gateway.viewer_count() == 0
+        assert asyncio.run(viewer.next_frame()) is None
+
+    def test_load_generator(self):
+        """Test a short load run with slow viewers."""
+        report = asyncio.run(
+            run_load(games=2, viewers=200, duration=0.3, event_hz=100, max_hz=20)
+        )
+        assert report.frames_delivered > 0
+        assert report.slow_drops > 0